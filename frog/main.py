@@ -26,21 +26,34 @@
 # use or other dealings in this Software without prior written
 # authorization.
 
-import datetime
 import sys
 from gettext import gettext as _
 
-import nanoid
-from gi.repository import Gtk, Gio, GLib, Notify, Adw, GdkPixbuf, Gdk, GObject
+from gi.repository import Gtk, Gio, GLib, Adw, Gdk, GObject
 from loguru import logger
 
 from frog.config import RESOURCE_PREFIX, APP_ID
 from frog.language_manager import language_manager
-from frog.services.clipboard_service import clipboard_service
 from frog.services.screenshot_service import ScreenshotService
 from frog.services.telemetry import telemetry
 from frog.settings import Settings
-from frog.window import FrogWindow
+
+
+# (action name, handler method name, accelerators)
+_ACTIONS = (
+    ('get_screenshot', 'get_screenshot', ('<primary>g',)),
+    ('get_screenshot_and_copy', 'get_screenshot_and_copy', ('<primary><shift>g',)),
+    ('copy_to_clipboard', 'on_copy_to_clipboard', ('<primary>g',)),
+    ('open_image', 'open_image', ('<primary>o',)),
+    ('paste_from_clipboard', 'on_paste_from_clipboard', ('<primary>v',)),
+    ('listen', 'on_listen', ('<primary>l',)),
+    ('listen_cancel', 'on_listen_cancel', ('<primary><ctrl>l',)),
+    ('shortcuts', 'on_shortcuts', ('<primary>question',)),
+    ('quit', 'on_quit', ('<primary>q', '<primary>w')),
+    ('about', 'on_about', None),
+    ('preferences', 'on_preferences', ('<primary>comma',)),
+    ('github_star', 'on_github_star', None),
+)
 
 
 class FrogApplication(Adw.Application):
@@ -55,13 +68,17 @@ class FrogApplication(Adw.Application):
                          flags=Gio.ApplicationFlags.HANDLES_COMMAND_LINE)
         self.backend = None
         self.version = version
+        self._active_window = None
 
         # Init GSettings
         self.settings = Settings.new()
 
         telemetry.set_is_active(self.settings.get_boolean('telemetry'))
+        self._telemetry_capture = telemetry.capture
         self.ensure_installation_id()
 
+        self.connect('notify::active-window', self._on_active_window_changed)
+
         self.add_main_option(
             'extract_to_clipboard',
             ord('e'),
@@ -71,24 +88,11 @@ class FrogApplication(Adw.Application):
             None
         )
 
-        # Initialize tesseract data files storage.
-        language_manager.init_tessdata()
-
-        # Initialize libnotify.
-        Notify.init("Frog")
-
     def do_startup(self, *args, **kwargs):
         Adw.Application.do_startup(self)
 
-        # create command line option entries
-        shortcut_entry = GLib.OptionEntry()
-        shortcut_entry.long_name = 'extract_to_clipboard'
-        shortcut_entry.short_name = ord('e')
-        shortcut_entry.flags = 0
-        shortcut_entry.arg = GLib.OptionArg.NONE
-        shortcut_entry.arg_date = None
-        shortcut_entry.description = _("Extract directly into the clipboard")
-        shortcut_entry.arg_description = None
+        # Initialize tesseract data files storage once the main loop is idle.
+        GLib.idle_add(language_manager.init_tessdata, priority=GLib.PRIORITY_LOW)
 
         self.backend = ScreenshotService()
         self.backend.connect('decoded', FrogApplication.on_decoded)
@@ -97,25 +101,15 @@ class FrogApplication(Adw.Application):
         action.connect("activate", self.on_show_uri)
         self.add_action(action)
 
-        self.create_action('get_screenshot', self.get_screenshot, ['<primary>g'])
-        self.create_action('get_screenshot_and_copy', self.get_screenshot_and_copy, ['<primary><shift>g'])
-        self.create_action('copy_to_clipboard', self.on_copy_to_clipboard, ['<primary>g'])
-        self.create_action('open_image', self.open_image, ['<primary>o'])
-        self.create_action('paste_from_clipboard', self.on_paste_from_clipboard, ['<primary>v'])
-        self.create_action('listen', self.on_listen, ['<primary>l'])
-        self.create_action('listen_cancel', self.on_listen_cancel, ['<primary><ctrl>l'])
-        self.create_action('shortcuts', self.on_shortcuts, ['<primary>question'])
-
-        self.create_action('quit', lambda *_: self.quit(), ['<primary>q', '<primary>w'])
-        self.create_action('about', self.on_about)
-        self.create_action('preferences', self.on_preferences, ['<primary>comma'])
-        self.create_action('github_star', self.on_github_star)
+        for name, method, shortcuts in _ACTIONS:
+            self.create_action(name, getattr(self, method), shortcuts)
 
         self.settings.connect("changed", self.on_settings_changed)
 
     def do_activate(self):
-        win = self.props.active_window
+        win = self._active_window
         if not win:
+            from frog.window import FrogWindow
             win = FrogWindow(application=self)
         win.present()
 
@@ -124,6 +118,8 @@ class FrogApplication(Adw.Application):
         options = options.end().unpack()
 
         if "extract_to_clipboard" in options:
+            # Capture runs OCR right away, before the idle-scheduled init.
+            language_manager.init_tessdata()
             self.backend.capture(self.settings.get_string("active-language"), True)
             return 1
 
@@ -133,11 +129,13 @@ class FrogApplication(Adw.Application):
     def ensure_installation_id(self):
         self.installation_id = self.settings.get_string("installation-id")
         if not self.installation_id:
+            import nanoid
+
             logger.info("No installation id was found. Generating a new one.")
             self.installation_id = nanoid.generate()
             self.settings.set_string("installation-id", self.installation_id)
             telemetry.set_installation_id(self.installation_id)
-            telemetry.capture('new Installation ID generated')
+            self._capture('new Installation ID generated')
 
         telemetry.set_installation_id(self.installation_id)
 
@@ -145,24 +143,30 @@ class FrogApplication(Adw.Application):
         logger.debug('SETTINGS: %s changed', key)
         if key == "telemetry":
             value = settings.get_boolean(key)
+            # Captured synchronously, before the new state is applied.
             if value:
                 telemetry.capture('telemetry activated')
             else:
                 telemetry.capture('telemetry deactivated')
             telemetry.set_is_active(value)
 
+    def on_quit(self, _action, _param) -> None:
+        self.quit()
+
     def on_preferences(self, _action, _param) -> None:
-        telemetry.capture('preferences activated')
-        self.get_active_window().show_preferences()
+        self._capture('preferences activated')
+        self._active_window.show_preferences()
 
     def on_github_star(self, _action, _param) -> None:
-        telemetry.capture('star github activated')
+        self._capture('star github activated')
         launcher: Gtk.UriLauncher = Gtk.UriLauncher()
         launcher.set_uri('https://github.com/TenderOwl/Frog')
         launcher.launch(callback=self._on_github_star)
 
     def on_about(self, _action, _param):
-        telemetry.capture('about activated')
+        import datetime
+
+        self._capture('about activated')
         about_window = Adw.AboutDialog(
             application_name="Frog",
             application_icon=APP_ID,
@@ -185,64 +189,53 @@ class FrogApplication(Adw.Application):
                 <p>We hope you enjoy our work!</p>
             """
         )
-        about_window.present(self.props.active_window)
+        about_window.present(self._active_window)
 
     def on_shortcuts(self, _action, _param):
-        telemetry.capture('shortcuts activated')
+        self._capture('shortcuts activated')
         builder = Gtk.Builder()
         builder.add_from_resource(f"{RESOURCE_PREFIX}/ui/shortcuts.ui")
-        builder.get_object("shortcuts").set_transient_for(self.get_active_window())
+        builder.get_object("shortcuts").set_transient_for(self._active_window)
         builder.get_object("shortcuts").present()
 
     def on_copy_to_clipboard(self, _action, _param) -> None:
-        telemetry.capture('copy_to_clipboard activated')
-        self.get_active_window().on_copy_to_clipboard(self)
+        self._capture('copy_to_clipboard activated')
+        self._active_window.on_copy_to_clipboard(self)
 
     def on_show_uri(self, _action, param) -> None:
-        telemetry.capture('show_uri activated')
+        self._capture('show_uri activated')
         Gtk.show_uri(None, param.get_string(), Gdk.CURRENT_TIME)
 
     def get_screenshot(self, _action, _param) -> None:
-        telemetry.capture('screenshot activated')
-        self.get_active_window().get_screenshot()
+        self._capture('screenshot activated')
+        self._active_window.get_screenshot()
 
     def get_screenshot_and_copy(self, _action, _param) -> None:
-        telemetry.capture('screenshot_and_copy activated')
-        self.get_active_window().get_screenshot(copy=True)
+        self._capture('screenshot_and_copy activated')
+        self._active_window.get_screenshot(copy=True)
 
     def open_image(self, _action, _param) -> None:
-        telemetry.capture('open_image activated')
-        self.get_active_window().open_image()
+        self._capture('open_image activated')
+        self._active_window.open_image()
 
     def on_paste_from_clipboard(self, _action, _param) -> None:
-        telemetry.capture('paste_from_clipboard activated')
-        self.get_active_window().on_paste_from_clipboard(self)
+        self._capture('paste_from_clipboard activated')
+        self._active_window.on_paste_from_clipboard(self)
 
     @staticmethod
     def on_decoded(_sender, text: str, copy: bool) -> None:
-        # icon = GdkPixbuf.Pixbuf.new_from_resource_at_scale(
-        #     f"{RESOURCE_PREFIX}/icons/com.github.tenderowl.frog.svg",
-        #     128, 128, True
-        # )
-
-        if not text:
-            # notification: Notify.Notification = Notify.Notification.new(
-            #     summary='Frog',
-            #     body=_("No text found. Try to grab another region.")
-            # )
-            # notification.set_icon_from_pixbuf(icon)
-            # notification.show()
-            pass
         if copy:
+            from frog.services.clipboard_service import clipboard_service
             clipboard_service.set(text)
-        else:
-            logger.debug(f'{text}\n')
+            return
+
+        logger.opt(lazy=True).debug('{}\n', lambda: text)
 
     def on_listen(self, _sender, _event):
-        self.get_active_window().on_listen()
+        self._active_window.on_listen()
 
     def on_listen_cancel(self, _sender, _event):
-        self.get_active_window().on_listen_cancel()
+        self._active_window.on_listen_cancel()
 
     def create_action(self, name, callback, shortcuts=None):
         """Add an application action.
@@ -251,17 +244,24 @@ class FrogApplication(Adw.Application):
             name: the name of the action
             callback: the function to be called when the action is
               activated
-            shortcuts: an optional list of accelerators
+            shortcuts: an optional sequence of accelerators
         """
         action = Gio.SimpleAction.new(name, None)
         action.connect("activate", callback)
         self.add_action(action)
-        if shortcuts:
+        if shortcuts is not None:
             self.set_accels_for_action(f"app.{name}", shortcuts)
 
     def _on_github_star(self, _, result):
         pass
 
+    def _on_active_window_changed(self, _app, _pspec):
+        self._active_window = self.props.active_window
+
+    def _capture(self, event: str) -> None:
+        # Let the main loop dispatch the user-visible action first.
+        GLib.idle_add(self._telemetry_capture, event, priority=GLib.PRIORITY_LOW)
+
 
 def main(version):
     app = FrogApplication(version)